@@ -0,0 +1,21 @@
+# Precompiles the indicator kernel so the screener skips Numba's JIT warm-up.
+# Run once with `python3 build_indicators.py`; plot_sma_rsi_macd.py picks up
+# the resulting indicator_kernels extension automatically when present, and
+# falls back to the JIT kernel if numba_kernels.py has changed since the build.
+from pathlib import Path
+from numba.pycc import CC
+from numba_kernels import _compute_all
+from plot_sma_rsi_macd import kernel_source_hash
+
+SOURCE_HASH = kernel_source_hash()
+
+def _source_hash():
+    return SOURCE_HASH
+
+cc = CC('indicator_kernels')
+cc.output_dir = str(Path(__file__).resolve().parent)
+cc.export('compute_all', 'f4[:,:](f4[:])')(_compute_all)
+cc.export('source_hash', 'i8()')(_source_hash)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,111 @@
+import numpy as np
+from numba import njit, prange
+
+def _compute_all(close):
+    n = close.shape[0]
+    out = np.full((5, n), np.nan, dtype=np.float32)
+    k_fast = 2.0 / 13
+    k_slow = 2.0 / 27
+    k_sig = 2.0 / 10
+    k_rsi = 1.0 / 14
+
+    sum20 = 0.0
+    sum50 = 0.0
+    nan20 = 0
+    nan50 = 0
+    nobs = 0
+    ema_fast = np.nan
+    ema_slow = np.nan
+    wt_fast = 1.0
+    wt_slow = 1.0
+    nobs_sig = 0
+    ema_sig = np.nan
+    avg_up = 0.0
+    avg_down = 0.0
+    for i in range(n):
+        x = close[i]
+        valid = x == x
+
+        # SMA20 / SMA50 via running sums; any NaN in the window gives NaN,
+        # as rolling(window).mean() does
+        if valid:
+            sum20 += x
+            sum50 += x
+        else:
+            nan20 += 1
+            nan50 += 1
+        if i >= 20:
+            old = close[i - 20]
+            if old == old:
+                sum20 -= old
+            else:
+                nan20 -= 1
+        if i >= 50:
+            old = close[i - 50]
+            if old == old:
+                sum50 -= old
+            else:
+                nan50 -= 1
+        if i >= 19 and nan20 == 0:
+            out[0, i] = sum20 / 20
+        if i >= 49 and nan50 == 0:
+            out[1, i] = sum50 / 50
+
+        # EMA12 / EMA26 as ewm(adjust=False): seeded with the first valid
+        # close, and a NaN close decays the old weight without replacing
+        # the mean, which is carried forward
+        if valid:
+            nobs += 1
+        if ema_fast == ema_fast:
+            wt_fast *= 1.0 - k_fast
+            wt_slow *= 1.0 - k_slow
+            if valid:
+                ema_fast = (wt_fast * ema_fast + k_fast * x) / (wt_fast + k_fast)
+                ema_slow = (wt_slow * ema_slow + k_slow * x) / (wt_slow + k_slow)
+                wt_fast = 1.0
+                wt_slow = 1.0
+        elif valid:
+            ema_fast = x
+            ema_slow = x
+
+        # Wilder RSI(14) over price changes; the averages start from the
+        # zero change at bar 0, and a NaN change counts as zero, matching
+        # ta's RSIIndicator
+        delta = x - close[i - 1] if i > 0 else 0.0
+        up = delta if delta > 0 else 0.0
+        down = -delta if delta < 0 else 0.0
+        avg_up += k_rsi * (up - avg_up)
+        avg_down += k_rsi * (down - avg_down)
+        if i >= 13:
+            if avg_down > 0:
+                out[2, i] = 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+            else:
+                out[2, i] = 100.0
+
+        # MACD(12, 26) and its 9-period signal line
+        if nobs >= 26:
+            macd = ema_fast - ema_slow
+            out[3, i] = macd
+            nobs_sig += 1
+            if nobs_sig == 1:
+                ema_sig = macd
+            else:
+                ema_sig += k_sig * (macd - ema_sig)
+            if nobs_sig >= 9:
+                out[4, i] = ema_sig
+
+    return out
+
+# fastmath without 'nnan'/'ninf': the kernel writes NaN and tests for it
+FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+compute_all = njit(cache=True, fastmath=FASTMATH)(_compute_all)
+
+@njit(cache=True, fastmath=FASTMATH, parallel=True)
+def compute_batch(closes, offsets):
+    out = np.empty((5, closes.shape[0]), dtype=np.float32)
+    for k in prange(offsets.shape[0] - 1):
+        start = offsets[k]
+        end = offsets[k + 1]
+        out[:, start:end] = compute_all(closes[start:end])
+    return out
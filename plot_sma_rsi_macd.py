@@ -1,65 +1,203 @@
+import os
 import sys
-import yfinance as yf
-import pandas as pd
-import matplotlib.pyplot as plt
-from ta.momentum import RSIIndicator
-from ta.trend import MACD
-import yaml
+import argparse
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 from pathlib import Path
+import numpy as np
 
-def fetch_stock_data(ticker, period="6mo", interval="1d"):
-    stock = yf.Ticker(ticker)
-    df = stock.history(period=period, interval=interval)
-    if df.empty or df['Close'].isna().all():
-        raise ValueError(f"No data for ticker {ticker}. Is it delisted or incorrect?")
-    return df
+INDICATOR_COLUMNS = ['SMA20', 'SMA50', 'RSI', 'MACD', 'MACD_SIGNAL']
 
-def calculate_indicators(df):
-    df['SMA20'] = df['Close'].rolling(window=20).mean()
-    df['SMA50'] = df['Close'].rolling(window=50).mean()
+CACHE_DIR = Path.home() / ".cache" / "stock-tools"
 
-    rsi = RSIIndicator(close=df['Close'], window=14)
-    df['RSI'] = rsi.rsi()
+def cache_path(ticker, period, interval):
+    key = hashlib.md5(f"{ticker}{period}{interval}{date.today()}".encode()).hexdigest()
+    return CACHE_DIR / f"{key}.parquet"
 
-    macd = MACD(close=df['Close'], window_slow=26, window_fast=12, window_sign=9)
-    df['MACD'] = macd.macd()
-    df['MACD_SIGNAL'] = macd.macd_signal()
+def read_cache(path):
+    import pandas as pd
 
-    return df
+    # A missing or unreadable (e.g. truncated) file is just a cache miss
+    try:
+        return pd.read_parquet(path, engine="pyarrow")
+    except Exception:
+        return None
 
-def check_buy_signal(df):
-    if len(df) < 2:
-        return False, None, {}
+def write_cache(df, path):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(tmp, engine="pyarrow")
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
 
-    yesterday = df.iloc[-2]
-    today = df.iloc[-1]
+def make_session():
+    from curl_cffi import requests as curl_requests
+    return curl_requests.Session(impersonate="chrome")
 
-    signals = {
-        'sma_crossover': False,
-        'rsi_oversold': False,
-        'macd_crossover': False,
-    }
+def fetch_batch_data(tickers, period="6mo", interval="1d", session=None):
+    frames = {}
+    missing = []
+    for ticker in tickers:
+        df = read_cache(cache_path(ticker, period, interval))
+        if df is not None:
+            frames[ticker] = df
+        else:
+            missing.append(ticker)
+
+    if not missing:
+        return frames
+
+    import yfinance as yf
+
+    if session is None:
+        session = make_session()
+    data = yf.download(missing, period=period, interval=interval, group_by='ticker', threads=True, progress=False, session=session)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for ticker in missing:
+        if ticker not in data.columns.get_level_values(0):
+            continue
+        df = data[ticker].dropna(how='all')
+        if df.empty or df['Close'].isna().all():
+            continue
+        write_cache(df, cache_path(ticker, period, interval))
+        frames[ticker] = df
+    return frames
+
+def compute_all_numpy(close):
+    import pandas as pd
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    n = close.shape[0]
+    out = np.full((5, n), np.nan, dtype=np.float32)
+    if n >= 20:
+        out[0, 19:] = sliding_window_view(close, 20).mean(axis=-1, dtype=np.float64)
+    if n >= 50:
+        out[1, 49:] = sliding_window_view(close, 50).mean(axis=-1, dtype=np.float64)
+
+    series = pd.Series(close, dtype=np.float64)
+    delta = series.diff().fillna(0)
+    avg_up = delta.clip(lower=0).ewm(alpha=1/14, min_periods=14, adjust=False).mean()
+    avg_down = (-delta.clip(upper=0)).ewm(alpha=1/14, min_periods=14, adjust=False).mean()
+    out[2] = np.where(avg_down == 0, 100, 100 - 100 / (1 + avg_up / avg_down))
+
+    ema_fast = series.ewm(span=12, min_periods=12, adjust=False).mean()
+    ema_slow = series.ewm(span=26, min_periods=26, adjust=False).mean()
+    macd = ema_fast - ema_slow
+    out[3] = macd
+    out[4] = macd.ewm(span=9, min_periods=9, adjust=False).mean()
+    return out
+
+KERNEL_SOURCE = Path(__file__).resolve().parent / "numba_kernels.py"
 
-    if yesterday['SMA20'] < yesterday['SMA50'] and today['SMA20'] > today['SMA50']:
-        signals['sma_crossover'] = True
+def kernel_source_hash():
+    digest = hashlib.sha256(KERNEL_SOURCE.read_bytes()).hexdigest()
+    return int(digest[:15], 16)
 
-    if yesterday['RSI'] < 30 and today['RSI'] >= 30:
-        signals['rsi_oversold'] = True
+def load_aot_kernel():
+    try:
+        import indicator_kernels
+    except ImportError:
+        return None
 
-    if yesterday['MACD'] < yesterday['MACD_SIGNAL'] and today['MACD'] > today['MACD_SIGNAL']:
-        signals['macd_crossover'] = True
+    built_hash = getattr(indicator_kernels, 'source_hash', None)
+    if built_hash is None or built_hash() != kernel_source_hash():
+        print("⚠️ indicator_kernels is out of date with numba_kernels.py; "
+              "rebuild it with `python3 build_indicators.py`. Using the JIT kernel for now.")
+        return None
+    return indicator_kernels.compute_all
+
+_indicator_kernel = None
+
+def get_indicator_kernel():
+    global _indicator_kernel
+    if _indicator_kernel is not None:
+        return _indicator_kernel
+
+    _indicator_kernel = load_aot_kernel()
+    if _indicator_kernel is None:
+        try:
+            from numba_kernels import compute_all
+            _indicator_kernel = compute_all
+        except ImportError:
+            _indicator_kernel = compute_all_numpy
+    return _indicator_kernel
+
+def compute_batch_serial(closes, offsets):
+    kernel = get_indicator_kernel()
+    out = np.empty((5, closes.shape[0]), dtype=np.float32)
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        out[:, start:end] = kernel(closes[start:end])
+    return out
+
+def get_batch_kernel():
+    # Only the JIT kernel has a parallel batch version; the AOT module and
+    # the NumPy fallback run ticker by ticker
+    kernel = get_indicator_kernel()
+    numba_kernels = sys.modules.get('numba_kernels')
+    if numba_kernels is not None and kernel is numba_kernels.compute_all:
+        return numba_kernels.compute_batch
+    return compute_batch_serial
+
+def calculate_indicators_batch(frames):
+    if not frames:
+        return frames
+
+    tickers = list(frames)
+    closes = [frames[t]['Close'].to_numpy(dtype=np.float32) for t in tickers]
+    offsets = np.zeros(len(closes) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in closes], out=offsets[1:])
+
+    out = get_batch_kernel()(np.concatenate(closes), offsets)
+    for ticker, start, end in zip(tickers, offsets[:-1], offsets[1:]):
+        frames[ticker][INDICATOR_COLUMNS] = out[:, start:end].T
+    return frames
+
+def crossed_above(a, b):
+    return (a.shift(1) < b.shift(1)) & (a > b)
+
+def compute_signal_masks(df):
+    return {
+        'sma_crossover': crossed_above(df['SMA20'], df['SMA50']),
+        'rsi_oversold': (df['RSI'].shift(1) < 30) & (df['RSI'] >= 30),
+        'macd_crossover': crossed_above(df['MACD'], df['MACD_SIGNAL']),
+    }
+
+def check_buy_signal(df):
+    if len(df) < 2:
+        return False, None, {}, 0
+
+    masks = compute_signal_masks(df)
+    signals = {name: bool(mask.iat[-1]) for name, mask in masks.items()}
 
     match_count = sum(signals.values())
     overall = match_count >= 2
 
-    return overall, df.index[-1], signals
+    return overall, df.index[-1], signals, match_count
+
+_plot_axes = None
 
-def plot_stock(df, ticker, buy_date=None):
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), sharex=True, gridspec_kw={'height_ratios': [2.5, 1, 1]})
+def get_plot_axes():
+    global _plot_axes
+    if _plot_axes is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _, _plot_axes = plt.subplots(3, 1, figsize=(12, 10), sharex=True, constrained_layout=True, gridspec_kw={'height_ratios': [2.5, 1, 1]})
+    for ax in _plot_axes:
+        ax.clear()
+        ax.label_outer()
+    return _plot_axes
 
-    ax1.plot(df.index, df['Close'], label="Close Price", linewidth=1.5)
-    ax1.plot(df.index, df['SMA20'], label="SMA20", linestyle='--')
-    ax1.plot(df.index, df['SMA50'], label="SMA50", linestyle='--')
+def plot_stock(df, ticker, axes, buy_date=None):
+    ax1, ax2, ax3 = axes
+    fig = ax1.figure
+
+    ax1.plot(df.index, df['Close'], label="Close Price", linewidth=1.5, rasterized=True)
+    ax1.plot(df.index, df['SMA20'], label="SMA20", linestyle='--', rasterized=True)
+    ax1.plot(df.index, df['SMA50'], label="SMA50", linestyle='--', rasterized=True)
     if buy_date:
         ax1.axvline(x=buy_date, color='green', linestyle=':', linewidth=2, label='Buy Signal')
     ax1.set_ylabel("Price ($)")
@@ -67,70 +205,124 @@ def plot_stock(df, ticker, buy_date=None):
     ax1.legend()
     ax1.grid(True)
 
-    ax2.plot(df.index, df['RSI'], label='RSI (14)', color='purple')
+    ax2.plot(df.index, df['RSI'], label='RSI (14)', color='purple', rasterized=True)
     ax2.axhline(y=30, color='red', linestyle='--', linewidth=1)
     ax2.axhline(y=70, color='red', linestyle='--', linewidth=1)
     ax2.set_ylabel("RSI")
     ax2.legend()
     ax2.grid(True)
 
-    ax3.plot(df.index, df['MACD'], label='MACD', color='blue')
-    ax3.plot(df.index, df['MACD_SIGNAL'], label='MACD Signal', color='orange')
+    ax3.plot(df.index, df['MACD'], label='MACD', color='blue', rasterized=True)
+    ax3.plot(df.index, df['MACD_SIGNAL'], label='MACD Signal', color='orange', rasterized=True)
     ax3.axhline(y=0, color='gray', linestyle='--', linewidth=1)
     ax3.set_ylabel("MACD")
     ax3.set_xlabel("Date")
     ax3.legend()
     ax3.grid(True)
 
-    plt.tight_layout()
     filename = f"{ticker}_sma_plot.png"
-    plt.savefig(filename)
+    fig.savefig(filename, dpi=100, pil_kwargs={'compress_level': 1})
     print(f"📁 Plot saved to {filename}")
-    plt.close()
 
-def print_signal_breakdown(ticker, buy_date, signals):
+def print_signal_breakdown(ticker, buy_date, signals, match_count):
     print(f"\n📈 Buy signal detected for {ticker} on {buy_date.date()}.\n")
     print(f"📊 Buy Signal Breakdown:")
     print(f"→ SMA20 crossover:     {'✔' if signals['sma_crossover'] else '✘'}")
     print(f"→ RSI recovery (>30):  {'✔' if signals['rsi_oversold'] else '✘'}")
     print(f"→ MACD crossover:      {'✔' if signals['macd_crossover'] else '✘'}")
-    match_count = sum(signals.values())
     print(f"→ Signal Confidence:   {int((match_count / 3) * 100)}%\n")
 
-def load_tickers_from_yaml(file_path):
-    with open(file_path, 'r') as f:
-        data = yaml.safe_load(f)
-    return data.get("tickers", [])
+def load_tickers(file_path):
+    return Path(file_path).read_text().split()
+
+def write_summary(results, filename="signals.csv"):
+    import pandas as pd
+
+    rows = []
+    for ticker, signal, buy_date, signals, match_count, error in results:
+        rows.append({
+            'ticker': ticker,
+            'signal': signal,
+            'date': buy_date.date() if buy_date is not None else None,
+            **signals,
+            'match_count': match_count,
+            'error': error,
+        })
+    pd.DataFrame(rows).to_csv(filename, index=False)
+    print(f"📁 Summary saved to {filename}")
+
+def process_ticker(ticker, df):
+    if df is None:
+        return ticker, False, None, {}, 0, f"No data for ticker {ticker}. Is it delisted or incorrect?"
+    try:
+        signal, buy_date, signals, match_count = check_buy_signal(df)
+    except Exception as e:
+        return ticker, False, None, {}, 0, str(e)
+    return ticker, signal, buy_date, signals, match_count, None
+
+def plot_ticker(ticker, df, buy_date):
+    try:
+        plot_stock(df, ticker, get_plot_axes(), buy_date)
+    except Exception as e:
+        return str(e)
+    return None
+
+def plot_tickers(jobs):
+    if not jobs:
+        return
+
+    max_workers = min(len(jobs), os.cpu_count() or 1)
+    # spawn, not fork: the parallel indicator kernel has already started
+    # Numba's threading layer in this process, and forking it hangs on exit
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        errors = list(ex.map(plot_ticker, *zip(*jobs)))
+
+    for (ticker, _, _), error in zip(jobs, errors):
+        if error:
+            print(f"⚠️ Error plotting {ticker}: {error}")
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python3 improved_sma.py tickers.yaml")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Screen tickers for SMA/RSI/MACD buy signals.")
+    parser.add_argument('tickers_file', help="text file with whitespace-separated tickers")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--plot', action='store_true', help="plot every ticker, not only those with a buy signal")
+    output.add_argument('--summary-only', action='store_true', help="write signals.csv and skip plotting entirely")
+    args = parser.parse_args()
 
-    yaml_file = sys.argv[1]
-    if not Path(yaml_file).exists():
-        print(f"YAML file not found: {yaml_file}")
+    tickers_file = args.tickers_file
+    if not Path(tickers_file).exists():
+        print(f"Tickers file not found: {tickers_file}")
         sys.exit(1)
 
-    tickers = load_tickers_from_yaml(yaml_file)
+    tickers = load_tickers(tickers_file)
     if not tickers:
-        print("No tickers found in YAML file.")
+        print("No tickers found in tickers file.")
         sys.exit(1)
 
-    for ticker in tickers:
-        ticker = ticker.upper()
-        print(f"\n📡 Analyzing {ticker}...")
-        try:
-            df = fetch_stock_data(ticker)
-            df = calculate_indicators(df)
-            signal, buy_date, signals = check_buy_signal(df)
-            if signal:
-                print_signal_breakdown(ticker, buy_date, signals)
-            else:
-                print(f"❌ No buy signal for {ticker} at this time.")
-            plot_stock(df, ticker, buy_date if signal else None)
-        except Exception as e:
-            print(f"⚠️ Error processing {ticker}: {e}")
+    tickers = [ticker.upper() for ticker in tickers]
+    print(f"\n📡 Analyzing {len(tickers)} tickers...")
+    frames = fetch_batch_data(tickers)
+    frames = calculate_indicators_batch(frames)
+
+    results = [process_ticker(t, frames.get(t)) for t in tickers]
+
+    if args.summary_only:
+        write_summary(results)
+        return
+
+    plot_tickers([
+        (ticker, frames[ticker], buy_date if signal else None)
+        for ticker, signal, buy_date, _, _, error in results
+        if not error and (signal or args.plot)
+    ])
+
+    for ticker, signal, buy_date, signals, match_count, error in results:
+        if error:
+            print(f"⚠️ Error processing {ticker}: {error}")
+        elif signal:
+            print_signal_breakdown(ticker, buy_date, signals, match_count)
+        else:
+            print(f"❌ No buy signal for {ticker} at this time.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from plot_sma_rsi_macd import read_cache, write_cache
+
+def test_cache_round_trip(tmp_path):
+    df = pd.DataFrame({'Close': [1.0, 2.0, 3.0]}, index=pd.date_range('2024-01-01', periods=3))
+    path = tmp_path / "key.parquet"
+    write_cache(df, path)
+    pd.testing.assert_frame_equal(read_cache(path), df, check_freq=False)
+    assert list(tmp_path.iterdir()) == [path]
+
+def test_missing_cache_is_a_miss(tmp_path):
+    assert read_cache(tmp_path / "missing.parquet") is None
+
+def test_truncated_cache_is_a_miss(tmp_path):
+    df = pd.DataFrame({'Close': [1.0, 2.0, 3.0]})
+    path = tmp_path / "key.parquet"
+    write_cache(df, path)
+    path.write_bytes(path.read_bytes()[:20])
+    assert read_cache(path) is None
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from plot_sma_rsi_macd import INDICATOR_COLUMNS, compute_all_numpy, compute_batch_serial
+
+def reference_indicators(close):
+    # pandas equivalent of the original rolling()/ta RSIIndicator/ta MACD code
+    series = pd.Series(close, dtype=np.float64)
+    delta = series.diff()
+    up = delta.where(delta > 0, 0.0)
+    down = -delta.where(delta < 0, 0.0)
+    avg_up = up.ewm(alpha=1/14, min_periods=14, adjust=False).mean()
+    avg_down = down.ewm(alpha=1/14, min_periods=14, adjust=False).mean()
+    rsi = np.where(avg_down == 0, 100, 100 - 100 / (1 + avg_up / avg_down))
+
+    ema_fast = series.ewm(span=12, min_periods=12, adjust=False).mean()
+    ema_slow = series.ewm(span=26, min_periods=26, adjust=False).mean()
+    macd = ema_fast - ema_slow
+    signal = macd.ewm(span=9, min_periods=9, adjust=False).mean()
+
+    return np.vstack([
+        series.rolling(20).mean(),
+        series.rolling(50).mean(),
+        rsi,
+        macd,
+        signal,
+    ])
+
+def random_walk(n=126, seed=0):
+    rng = np.random.default_rng(seed)
+    return (100 + np.cumsum(rng.normal(0, 1, n))).astype(np.float32)
+
+def with_nans(close, positions):
+    close = close.copy()
+    close[positions] = np.nan
+    return close
+
+CASES = {
+    'random_walk': random_walk(),
+    'nan_mid_series': with_nans(random_walk(seed=1), [60]),
+    'nan_leading': with_nans(random_walk(seed=2), [0]),
+    'nan_in_warmup': with_nans(random_walk(seed=3), [5, 6, 30]),
+    'flat_price': np.full(80, 50.0, dtype=np.float32),
+    'short_series': random_walk(n=10, seed=4),
+}
+
+def assert_matches_reference(out, close):
+    expected = reference_indicators(close)
+    for row, name in enumerate(INDICATOR_COLUMNS):
+        np.testing.assert_array_equal(np.isnan(out[row]), np.isnan(expected[row]), err_msg=name)
+        np.testing.assert_allclose(out[row], expected[row], rtol=1e-4, atol=1e-3, equal_nan=True, err_msg=name)
+
+@pytest.mark.parametrize('case', CASES)
+def test_numpy_kernel_matches_pandas(case):
+    close = CASES[case]
+    assert_matches_reference(compute_all_numpy(close), close)
+
+@pytest.mark.parametrize('case', CASES)
+def test_numba_kernel_matches_pandas(case):
+    numba_kernels = pytest.importorskip('numba_kernels')
+    close = CASES[case]
+    assert_matches_reference(numba_kernels.compute_all(close), close)
+
+def test_float32_rsi_matches_float64():
+    numba_kernels = pytest.importorskip('numba_kernels')
+    close = random_walk(n=500, seed=5).astype(np.float64)
+    rsi64 = numba_kernels.compute_all(close)[2]
+    rsi32 = numba_kernels.compute_all(close.astype(np.float32))[2]
+    assert np.allclose(rsi32, rsi64, atol=1e-3, equal_nan=True)
+
+def test_batch_matches_per_series():
+    closes = [CASES['random_walk'], CASES['nan_mid_series'], CASES['flat_price']]
+    offsets = np.zeros(len(closes) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in closes], out=offsets[1:])
+    flat = np.concatenate(closes)
+
+    expected = compute_batch_serial(flat, offsets)
+    for close, start, end in zip(closes, offsets[:-1], offsets[1:]):
+        assert_matches_reference(expected[:, start:end], close)
+
+    numba_kernels = pytest.importorskip('numba_kernels')
+    np.testing.assert_array_equal(numba_kernels.compute_batch(flat, offsets), expected)